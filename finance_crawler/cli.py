@@ -70,48 +70,51 @@ async def _harvest_async(
     """Async harvest implementation."""
     
     # Initialize components
-    fetcher = AsyncFetcher()
-    robots_checker = RobotsChecker()
-    storage = DocumentStorage(output_dir)
-    
-    total_documents = 0
-    source_stats = {}
-    
-    # Process each source
-    for source_name in source_names:
-        config = builtin_sources[source_name]
-        typer.echo(f"\nProcessing {config.name}...")
+    async with AsyncFetcher() as fetcher:
+        robots_checker = RobotsChecker(fetcher)
+        storage = DocumentStorage(output_dir, dry_run=dry_run)
         
-        spider = GenericSpider(config, fetcher, robots_checker)
+        total_documents = 0
+        source_stats = {}
         
-        # Create progress bar
-        with tqdm(desc=f"Crawling {config.name}", unit="pages") as pbar:
-            documents = await spider.crawl(max_pages)
+        # Process each source
+        for source_name in source_names:
+            config = builtin_sources[source_name]
+            typer.echo(f"\nProcessing {config.name}...")
             
-            # Filter by date if specified
-            if since_date:
-                filtered_docs = [
-                    doc for doc in documents 
-                    if not doc.published_date or doc.published_date >= since_date
-                ]
-                typer.echo(f"Filtered {len(documents) - len(filtered_docs)} documents older than {since_date}")
-                documents = filtered_docs
+            spider = GenericSpider(config, fetcher, robots_checker)
             
-            # Save documents
-            saved_count = 0
-            for doc in documents:
-                # Fetch document content
-                response = await fetcher.fetch(doc.source_url)
-                if response and response['content']:
-                    success = storage.save_document(doc, response['content'], dry_run)
+            # Create progress bar
+            with tqdm(desc=f"Crawling {config.name}", unit="pages") as pbar:
+                documents = await spider.crawl(max_pages)
+                
+                # Filter by date if specified
+                if since_date:
+                    filtered_docs = [
+                        doc for doc in documents 
+                        if not doc.record.published_date or doc.record.published_date >= since_date
+                    ]
+                    typer.echo(f"Filtered {len(documents) - len(filtered_docs)} documents older than {since_date}")
+                    documents = filtered_docs
+                
+                # Save documents using the content fetched during the crawl
+                saved_count = 0
+                saved_records = []
+                for doc in documents:
+                    success = storage.save_document(doc.record, doc.content, dry_run, catalog=False)
                     if success:
+                        saved_records.append(doc.record)
                         saved_count += 1
                         total_documents += 1
+                    
+                    pbar.update(1)
                 
-                pbar.update(1)
-            
-            source_stats[config.name] = saved_count
-            typer.echo(f"Saved {saved_count} documents from {config.name}")
+                # Add this source's records to the catalog
+                if not dry_run:
+                    storage.append_catalog(saved_records)
+                
+                source_stats[config.name] = saved_count
+                typer.echo(f"Saved {saved_count} documents from {config.name}")
     
     # Print final statistics
     typer.echo(f"\nHarvest complete!")
@@ -130,6 +133,8 @@ async def _harvest_async(
             typer.echo("  By domain:")
             for domain, count in catalog_stats['by_domain'].items():
                 typer.echo(f"    {domain}: {count}")
+    
+    storage.close()
 
 
 if __name__ == "__main__":
@@ -1,13 +1,62 @@
 import re
+from functools import lru_cache
 from datetime import date, datetime
 from dateutil import parser as date_parser
-from typing import Optional, List
-from urllib.parse import urlparse
+from typing import Optional, List, Dict
+from .utils import parse_url
+
+
+# Characters stripped from date strings before matching
+_CLEAN_RE = re.compile(r'[^\w\s\-/]')
+
+# Common date formats fused into one regex. At any position the
+# alternatives are tried in this order; the outer group name says which
+# format matched.
+_DATE_RE = re.compile(
+    r'\b(?:'
+    r'(?P<ymd>(?P<ymd_y>\d{4})[-/](?P<ymd_m>\d{1,2})[-/](?P<ymd_d>\d{1,2}))'  # YYYY/MM/DD
+    r'|(?P<dmy>(?P<dmy_d>\d{1,2})[-/](?P<dmy_m>\d{1,2})[-/](?P<dmy_y>\d{4}))'  # DD/MM/YYYY
+    r'|(?P<my>(?P<my_m>\d{1,2})[-/](?P<my_y>\d{4}))'  # MM/YYYY
+    r'|(?P<y>(?P<y_y>\d{4}))'  # Just year
+    r')\b'
+)
+
+# Common patterns for circular numbers
+_CIRCULAR_PATTERNS = [
+    re.compile(r'Circular\s+No\.?\s*([A-Z0-9/\-]+)', re.IGNORECASE),
+    re.compile(r'Notification\s+No\.?\s*([A-Z0-9/\-]+)', re.IGNORECASE),
+    re.compile(r'Circular\s+([A-Z0-9/\-]+)', re.IGNORECASE),
+    re.compile(r'No\.?\s*([A-Z0-9/\-]+)', re.IGNORECASE),
+]
+
+# Financial topic keywords (lowercase)
+_TOPIC_KEYWORDS = {
+    'mutual_funds': ('mutual fund', 'mf', 'nav', 'amc', 'sip'),
+    'equity': ('equity', 'stock', 'share', 'nse', 'bse', 'sensex', 'nifty'),
+    'taxation': ('tax', 'income tax', 'gst', 'tds', 'itr', 'assessment'),
+    'gold': ('gold', 'sgb', 'sovereign gold bond', 'precious metal'),
+    'insurance': ('insurance', 'policy', 'premium', 'claim'),
+    'banking': ('bank', 'rbi', 'loan', 'credit', 'deposit'),
+    'regulatory': ('sebi', 'rbi', 'circular', 'regulation', 'compliance'),
+    'education': ('education', 'awareness', 'investor', 'guide', 'handbook'),
+}
+
+# Keyword -> topics lookup and a single scanner over all keywords. The
+# lookahead lets matches overlap, so a keyword starting inside another
+# match is still found.
+_KEYWORD_TOPICS: Dict[str, List[str]] = {}
+for _topic, _keywords in _TOPIC_KEYWORDS.items():
+    for _keyword in _keywords:
+        _KEYWORD_TOPICS.setdefault(_keyword, []).append(_topic)
+
+_TOPIC_KEYWORD_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(k) for k in sorted(_KEYWORD_TOPICS, key=len, reverse=True)) + '))'
+)
 
 
 def extract_date_from_url(url: str) -> Optional[date]:
     """Extract date from URL path or query parameters."""
-    parsed = urlparse(url)
+    parsed = parse_url(url)
     
     # Check path segments for date patterns
     path_segments = parsed.path.split('/')
@@ -30,38 +79,38 @@ def extract_date_from_url(url: str) -> Optional[date]:
     return None
 
 
+@lru_cache(maxsize=4096)
 def parse_date_string(date_str: str) -> Optional[date]:
     """Parse various date string formats."""
     if not date_str:
         return None
     
     # Clean the string
-    date_str = re.sub(r'[^\w\s\-/]', '', date_str.strip())
+    date_str = _CLEAN_RE.sub('', date_str.strip())
     
-    # Common patterns
-    patterns = [
-        r'\b(\d{4})[-\/](\d{1,2})[-\/](\d{1,2})\b',  # YYYY/MM/DD
-        r'\b(\d{1,2})[-\/](\d{1,2})[-\/](\d{4})\b',  # DD/MM/YYYY
-        r'\b(\d{4})\b',  # Just year
-        r'\b(\d{1,2})[-\/](\d{4})\b',  # MM/YYYY
-    ]
+    # A full date anywhere in the string beats a bare year that precedes it
+    fallback_year = None
+    for match in _DATE_RE.finditer(date_str):
+        kind = match.lastgroup
+        year = int(match.group(f'{kind}_y'))
+        try:
+            if kind in ('ymd', 'dmy'):
+                return date(year, int(match.group(f'{kind}_m')), int(match.group(f'{kind}_d')))
+            elif kind == 'my':
+                return date(year, int(match.group('my_m')), 1)
+        except ValueError:
+            pass
+        
+        # Bare years and invalid full dates only count if no full date follows
+        if fallback_year is None and 1900 <= year <= 2030:  # Reasonable year range
+            fallback_year = year
     
-    for pattern in patterns:
-        match = re.search(pattern, date_str)
-        if match:
-            try:
-                if len(match.groups()) == 3:
-                    year, month, day = match.groups()
-                    return date(int(year), int(month), int(day))
-                elif len(match.groups()) == 2:
-                    month, year = match.groups()
-                    return date(int(year), int(month), 1)
-                elif len(match.groups()) == 1:
-                    year = int(match.group(1))
-                    if 1900 <= year <= 2030:  # Reasonable year range
-                        return date(year, 1, 1)
-            except (ValueError, TypeError):
-                continue
+    if fallback_year is not None:
+        return date(fallback_year, 1, 1)
+    
+    # Strings without digits are slugs, not dates; skip the slow fallback
+    if not any(c.isdigit() for c in date_str):
+        return None
     
     # Try dateutil parser as fallback
     try:
@@ -79,16 +128,8 @@ def extract_circular_number(text: str) -> Optional[str]:
     if not text:
         return None
     
-    # Common patterns for circular numbers
-    patterns = [
-        r'Circular\s+No\.?\s*([A-Z0-9/\-]+)',
-        r'Notification\s+No\.?\s*([A-Z0-9/\-]+)',
-        r'Circular\s+([A-Z0-9/\-]+)',
-        r'No\.?\s*([A-Z0-9/\-]+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _CIRCULAR_PATTERNS:
+        match = pattern.search(text)
         if match:
             return match.group(1).strip()
     
@@ -97,25 +138,13 @@ def extract_circular_number(text: str) -> Optional[str]:
 
 def extract_topic_tags(text: str, title: str = "") -> List[str]:
     """Extract topic tags from text and title."""
-    tags = []
-    
     # Combine text and title for analysis
     combined_text = f"{title} {text}".lower()
     
-    # Financial topic keywords
-    topic_keywords = {
-        'mutual_funds': ['mutual fund', 'mf', 'nav', 'amc', 'sip'],
-        'equity': ['equity', 'stock', 'share', 'nse', 'bse', 'sensex', 'nifty'],
-        'taxation': ['tax', 'income tax', 'gst', 'tds', 'itr', 'assessment'],
-        'gold': ['gold', 'sgb', 'sovereign gold bond', 'precious metal'],
-        'insurance': ['insurance', 'policy', 'premium', 'claim'],
-        'banking': ['bank', 'rbi', 'loan', 'credit', 'deposit'],
-        'regulatory': ['sebi', 'rbi', 'circular', 'regulation', 'compliance'],
-        'education': ['education', 'awareness', 'investor', 'guide', 'handbook'],
-    }
+    found = set()
+    for match in _TOPIC_KEYWORD_RE.finditer(combined_text):
+        found.update(_KEYWORD_TOPICS[match.group(1)])
     
-    for topic, keywords in topic_keywords.items():
-        if any(keyword in combined_text for keyword in keywords):
-            tags.append(topic)
+    tags = [topic for topic in _TOPIC_KEYWORDS if topic in found]
     
     return tags[:5]  # Limit to 5 tags
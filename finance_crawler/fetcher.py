@@ -1,9 +1,20 @@
 import asyncio
 import sqlite3
+import threading
+import time
 import httpx
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set, Tuple
 from pathlib import Path
+from .utils import exponential_backoff, content_type_filetype
+
+
+# Largest response body we download; regulator PDFs can reach 50-100 MB
+MAX_CONTENT_BYTES = 50 * 1024 * 1024
+
+# Pending cache writes are flushed after this many rows or seconds
+CACHE_FLUSH_ROWS = 200
+CACHE_FLUSH_SECONDS = 2.0
 
 
 class CacheEntry:
@@ -24,38 +35,87 @@ class AsyncFetcher:
     
     def __init__(self, cache_db_path: str = "cache.db", 
                  user_agent: str = "finance-crawler-mvp/0.1",
-                 timeout: float = 30.0):
+                 timeout: float = 30.0,
+                 max_bytes: int = MAX_CONTENT_BYTES,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
         self.cache_db_path = cache_db_path
         self.user_agent = user_agent
         self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._conn = sqlite3.connect(cache_db_path, check_same_thread=False, isolation_level=None)
+        self._db_lock = threading.Lock()
+        self._pending: Dict[str, tuple] = {}
+        self._last_flush = time.monotonic()
         self._init_cache_db()
     
+    async def __aenter__(self) -> "AsyncFetcher":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                transport=self.transport,
+                http2=True,
+                follow_redirects=True,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+                headers={
+                    "User-Agent": self.user_agent,
+                    "Accept": "text/html,application/pdf;q=0.9,*/*;q=0.5",
+                    "Accept-Encoding": "br, gzip, deflate"
+                }
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the shared HTTP client, its connection pool and the cache DB."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        with self._db_lock:
+            self._flush_pending()
+            self._conn.close()
+    
     def _init_cache_db(self):
         """Initialize SQLite cache database."""
-        conn = sqlite3.connect(self.cache_db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS cache (
-                url TEXT PRIMARY KEY,
-                etag TEXT,
-                last_modified TEXT,
-                status INTEGER,
-                stored_at TEXT
-            )
-        """)
-        conn.commit()
-        conn.close()
+        with self._db_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA temp_store=MEMORY")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    status INTEGER,
+                    stored_at TEXT
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS robots (
+                    host TEXT PRIMARY KEY,
+                    body TEXT,
+                    stored_at TEXT
+                )
+            """)
     
     def _get_cache_entry(self, url: str) -> Optional[CacheEntry]:
         """Get cache entry for URL."""
-        conn = sqlite3.connect(self.cache_db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT etag, last_modified, status, stored_at FROM cache WHERE url = ?",
-            (url,)
-        )
-        row = cursor.fetchone()
-        conn.close()
+        with self._db_lock:
+            row = self._pending.get(url)
+            if row:
+                row = row[1:]
+            else:
+                row = self._conn.execute(
+                    "SELECT etag, last_modified, status, stored_at FROM cache WHERE url = ?",
+                    (url,)
+                ).fetchone()
         
         if row:
             etag, last_modified, status, stored_at = row
@@ -64,22 +124,80 @@ class AsyncFetcher:
         return None
     
     def _set_cache_entry(self, entry: CacheEntry):
-        """Store cache entry."""
-        conn = sqlite3.connect(self.cache_db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT OR REPLACE INTO cache (url, etag, last_modified, status, stored_at)
-            VALUES (?, ?, ?, ?, ?)
-        """, (entry.url, entry.etag, entry.last_modified, entry.status, 
-              entry.stored_at.isoformat() if entry.stored_at else None))
-        conn.commit()
-        conn.close()
+        """Queue cache entry, writing queued entries in batches."""
+        with self._db_lock:
+            self._pending[entry.url] = (
+                entry.url, entry.etag, entry.last_modified, entry.status,
+                entry.stored_at.isoformat() if entry.stored_at else None
+            )
+            if (len(self._pending) >= CACHE_FLUSH_ROWS
+                    or time.monotonic() - self._last_flush >= CACHE_FLUSH_SECONDS):
+                self._flush_pending()
+    
+    def _flush_pending(self):
+        """Write queued cache entries in one transaction. Caller holds the DB lock."""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany("""
+                INSERT OR REPLACE INTO cache (url, etag, last_modified, status, stored_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, list(self._pending.values()))
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        self._pending.clear()
+    
+    def get_robots_entry(self, host: str) -> Optional[Tuple[str, datetime]]:
+        """Get stored robots.txt body and its storage time for a host."""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT body, stored_at FROM robots WHERE host = ?",
+                (host,)
+            ).fetchone()
+        
+        if row:
+            body, stored_at = row
+            return body, datetime.fromisoformat(stored_at)
+        return None
+    
+    def set_robots_entry(self, host: str, body: str):
+        """Store robots.txt body for a host."""
+        with self._db_lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO robots (host, body, stored_at)
+                VALUES (?, ?, ?)
+            """, (host, body, datetime.now().isoformat()))
+    
+    async def _read_limited(self, response: httpx.Response) -> Optional[bytes]:
+        """Read a streamed response body, or None if it exceeds max_bytes."""
+        content_length = response.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            return None
+        
+        # Content-Length may be missing or compressed, so also count while reading
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > self.max_bytes:
+                return None
+            chunks.append(chunk)
+        return b"".join(chunks)
     
-    async def fetch(self, url: str, max_retries: int = 3) -> Optional[Dict[str, Any]]:
-        """Fetch URL with caching and retry logic."""
+    async def fetch(self, url: str, max_retries: int = 3,
+                    filetypes: Optional[Set[str]] = None) -> Optional[Dict[str, Any]]:
+        """Fetch URL with caching and retry logic.
+        
+        With ``filetypes``, a body whose Content-Type maps to another file
+        type is not downloaded and the result has ``content`` None.
+        """
         cache_entry = self._get_cache_entry(url)
         
-        headers = {"User-Agent": self.user_agent}
+        headers = {}
         if cache_entry and cache_entry.etag:
             headers["If-None-Match"] = cache_entry.etag
         if cache_entry and cache_entry.last_modified:
@@ -87,9 +205,7 @@ class AsyncFetcher:
         
         for attempt in range(max_retries):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    response = await client.get(url, headers=headers)
-                    
+                async with self._get_client().stream("GET", url, headers=headers) as response:
                     # Handle 304 Not Modified
                     if response.status_code == 304:
                         return {
@@ -100,6 +216,23 @@ class AsyncFetcher:
                             "cached": True
                         }
                     
+                    # Skip bodies of types the caller can't use without downloading them
+                    if (filetypes is not None and content_type_filetype(
+                            response.headers.get("content-type", "")) not in filetypes):
+                        return {
+                            "url": url,
+                            "status_code": response.status_code,
+                            "content": None,
+                            "headers": dict(response.headers),
+                            "cached": False
+                        }
+                    
+                    # Skip oversize bodies without downloading them
+                    content = await self._read_limited(response)
+                    if content is None:
+                        print(f"Skipping {url}: larger than {self.max_bytes} bytes")
+                        return None
+                    
                     # Update cache entry
                     etag = response.headers.get("etag")
                     last_modified = response.headers.get("last-modified")
@@ -109,22 +242,20 @@ class AsyncFetcher:
                     return {
                         "url": url,
                         "status_code": response.status_code,
-                        "content": response.content,
+                        "content": content,
                         "headers": dict(response.headers),
                         "cached": False
                     }
-                    
+                
             except httpx.HTTPStatusError as e:
                 if e.response.status_code in [429, 500, 502, 503, 504]:
                     if attempt < max_retries - 1:
-                        delay = 2 ** attempt  # Exponential backoff
-                        await asyncio.sleep(delay)
+                        await asyncio.sleep(exponential_backoff(attempt))
                         continue
                 raise
             except Exception as e:
                 if attempt < max_retries - 1:
-                    delay = 2 ** attempt
-                    await asyncio.sleep(delay)
+                    await asyncio.sleep(exponential_backoff(attempt))
                     continue
                 raise
         
@@ -1,43 +1,50 @@
-from bs4 import BeautifulSoup
+import lxml.html
+from dataclasses import dataclass, field
 from urllib.parse import urljoin, urlparse
 from typing import List, Optional, Tuple
 
 
-def extract_html_links(content: bytes, base_url: str) -> List[str]:
-    """Extract links from HTML content."""
+@dataclass
+class HtmlParse:
+    """Links, title and meta description extracted from one HTML parse."""
+    links: List[str] = field(default_factory=list)
+    title: Optional[str] = None
+    meta_description: Optional[str] = None
+
+
+def parse_html(content: bytes, base_url: str) -> HtmlParse:
+    """Extract links, title and meta description from HTML content."""
     try:
-        soup = BeautifulSoup(content, 'lxml')
-        links = []
+        tree = lxml.html.fromstring(content)
         
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            absolute_url = urljoin(base_url, href)
-            links.append(absolute_url)
+        # XPath runs the traversal in C instead of walking Python node objects
+        links = [urljoin(base_url, href) for href in tree.xpath('//a/@href')]
         
-        return links
+        title = None
+        title_tags = tree.xpath('//title')
+        if title_tags:
+            title = title_tags[0].text_content().strip()
+        
+        meta_description = None
+        meta_contents = tree.xpath('//meta[@name="description"]/@content')
+        if meta_contents and meta_contents[0].strip():
+            meta_description = meta_contents[0].strip()
+        
+        return HtmlParse(links, title, meta_description)
     except Exception:
-        return []
+        return HtmlParse()
+
+
+def extract_html_links(content: bytes, base_url: str) -> List[str]:
+    """Extract links from HTML content."""
+    return parse_html(content, base_url).links
 
 
 def extract_html_title(content: bytes) -> Optional[str]:
     """Extract page title from HTML content."""
-    try:
-        soup = BeautifulSoup(content, 'lxml')
-        title_tag = soup.find('title')
-        if title_tag:
-            return title_tag.get_text().strip()
-        return None
-    except Exception:
-        return None
+    return parse_html(content, '').title
 
 
 def extract_html_meta_description(content: bytes) -> Optional[str]:
     """Extract meta description from HTML content."""
-    try:
-        soup = BeautifulSoup(content, 'lxml')
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc and meta_desc.get('content'):
-            return meta_desc['content'].strip()
-        return None
-    except Exception:
-        return None
+    return parse_html(content, '').meta_description
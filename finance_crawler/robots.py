@@ -1,35 +1,84 @@
+import asyncio
 import urllib.robotparser
-from urllib.parse import urlparse
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from typing import Dict, Optional
+from .fetcher import AsyncFetcher
+from .utils import parse_url
 
 
 class RobotsChecker:
     """Handles robots.txt checking for URLs."""
     
-    def __init__(self):
-        self._robots_cache: Dict[str, urllib.robotparser.RobotFileParser] = {}
+    def __init__(self, fetcher: AsyncFetcher, max_hosts: int = 256,
+                 max_age: timedelta = timedelta(days=1)):
+        self.fetcher = fetcher
+        self.max_hosts = max_hosts
+        self.max_age = max_age
+        self._robots_cache: "OrderedDict[str, urllib.robotparser.RobotFileParser]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
     
-    def is_allowed(self, url: str, user_agent: str = "finance-crawler-mvp/0.1") -> bool:
+    async def is_allowed(self, url: str, user_agent: str = "finance-crawler-mvp/0.1") -> bool:
         """Check if URL is allowed by robots.txt."""
-        parsed = urlparse(url)
+        parsed = parse_url(url)
         base_url = f"{parsed.scheme}://{parsed.netloc}"
         
-        # Get or create robot parser for this domain
-        if base_url not in self._robots_cache:
-            rp = urllib.robotparser.RobotFileParser()
-            robots_url = f"{base_url}/robots.txt"
-            rp.set_url(robots_url)
-            try:
-                rp.read()
-            except Exception:
-                # If robots.txt can't be read, assume allowed
-                pass
-            self._robots_cache[base_url] = rp
-        
-        robot_parser = self._robots_cache[base_url]
+        robot_parser = await self._get_parser(base_url)
         
         try:
             return robot_parser.can_fetch(user_agent, url)
         except Exception:
             # If there's any error, assume allowed
             return True
+    
+    async def _get_parser(self, base_url: str) -> urllib.robotparser.RobotFileParser:
+        """Get the robots.txt parser for a host, loading it on first use."""
+        if base_url in self._robots_cache:
+            self._robots_cache.move_to_end(base_url)
+            return self._robots_cache[base_url]
+        
+        # Only one worker loads robots.txt for a given host
+        lock = self._locks.setdefault(base_url, asyncio.Lock())
+        async with lock:
+            if base_url not in self._robots_cache:
+                self._robots_cache[base_url] = await self._load_parser(base_url)
+                if len(self._robots_cache) > self.max_hosts:
+                    evicted, _ = self._robots_cache.popitem(last=False)
+                    self._locks.pop(evicted, None)
+        
+        return self._robots_cache[base_url]
+    
+    async def _load_parser(self, base_url: str) -> urllib.robotparser.RobotFileParser:
+        """Build a parser from stored rules, fetching robots.txt when stale."""
+        rp = urllib.robotparser.RobotFileParser()
+        robots_url = f"{base_url}/robots.txt"
+        rp.set_url(robots_url)
+        
+        stored = self.fetcher.get_robots_entry(base_url)
+        if stored and datetime.now() - stored[1] < self.max_age:
+            rp.parse(stored[0].splitlines())
+            return rp
+        
+        body: Optional[str] = None
+        try:
+            response = await self.fetcher.fetch(robots_url)
+        except Exception:
+            response = None
+        
+        if response and response['cached'] and stored:
+            # Not modified since we stored it
+            body = stored[0]
+        elif response and response['status_code'] == 200 and response['content'] is not None:
+            body = response['content'].decode(errors='ignore')
+        elif response and response['status_code'] in (401, 403):
+            rp.disallow_all = True
+            return rp
+        
+        if body is None:
+            # If robots.txt can't be read, assume allowed
+            rp.allow_all = True
+            return rp
+        
+        self.fetcher.set_robots_entry(base_url, body)
+        rp.parse(body.splitlines())
+        return rp
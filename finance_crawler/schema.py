@@ -43,3 +43,4 @@ class DocumentRecord(BaseModel):
     intended_audience: Literal["investor", "policy", "education", "research", "general"] = "education"
     quality_flags: QualityFlags
     storage_path: Optional[str] = None
+    duplicate_of: Optional[str] = None  # id of the record whose identical file this shares
@@ -1,15 +1,125 @@
 import re
 import asyncio
-from typing import List, Set, Optional, Dict, Any
+from typing import List, Set, Optional, Dict, Any, FrozenSet
 from dataclasses import dataclass
-from urllib.parse import urlparse
 from ..schema import DocumentRecord, Domain, QualityFlags
 from ..fetcher import AsyncFetcher
 from ..robots import RobotsChecker
 from ..parser_html import extract_html_links, extract_html_title
-from ..parser_pdf import extract_pdf_metadata
+from ..parser_pdf import parse_pdf
 from ..extractor import extract_date_from_url, extract_circular_number, extract_topic_tags
-from ..utils import url_filetype, canonical_url, generate_document_id, is_allowed_filetype
+from ..utils import (
+    url_filetype, canonical_url, generate_document_id, is_allowed_filetype, url_key, parse_url,
+    content_type_filetype
+)
+
+
+# Upper bound on memoized should_process_url decisions per config
+_MAX_URL_DECISIONS = 8192
+
+
+# Characters with a special meaning in a regex, and those that quantify the
+# preceding item
+_REGEX_META = frozenset('.^$*+?{}[]()|\\')
+_REGEX_QUANTIFIERS = frozenset('*+?{')
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    """Check for a | outside any group or character class."""
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\':
+            i += 2
+            continue
+        if in_class:
+            if c == ']':
+                in_class = False
+        elif c == '[':
+            in_class = True
+            # A ] right after [ or [^ is a member, not the end of the class
+            if pattern[i + 1:i + 2] == '^':
+                i += 1
+            if pattern[i + 1:i + 2] == ']':
+                i += 1
+        elif c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == '|' and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Return the literal text every match of pattern must contain, e.g. "sebi.gov.in/".
+    
+    Scans the pattern text rather than a parsed form, stopping at the first
+    special character, so any construct it doesn't recognise ends the
+    literal early instead of producing a wrong one.
+    """
+    if _has_top_level_alternation(pattern):
+        return ''
+    
+    chars = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\':
+            # Escaped punctuation is literal; escapes like \d or \1 are not
+            literal = pattern[i + 1:i + 2]
+            if not literal or literal.isalnum():
+                break
+            step = 2
+        elif c in _REGEX_META:
+            break
+        else:
+            literal = c
+            step = 1
+        # A quantified character may be absent or repeated
+        if pattern[i + step:i + step + 1] in _REGEX_QUANTIFIERS:
+            break
+        chars.append(literal)
+        i += step
+    return ''.join(chars)
+
+
+def _derive_required_literals(allow_patterns: List[str]) -> Optional[FrozenSet[str]]:
+    """Collect literals a URL must contain one of to match, or None if a pattern has none."""
+    if not allow_patterns:
+        return None
+    
+    literals = set()
+    for pattern in allow_patterns:
+        literal = _literal_prefix(pattern)
+        if not literal:
+            return None
+        literals.add(literal)
+    
+    return frozenset(literals)
+
+
+# Numbered or named backreferences and group-conditional branches. Escaped
+# backslashes or class members can match too; that only prevents fusing.
+_GROUP_REF_RE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+
+def _compile_union(patterns: List[str]) -> Optional[re.Pattern]:
+    """Compile patterns into one alternation regex, or None if they can't be fused."""
+    if not patterns:
+        return None
+    try:
+        # Group numbers shift once patterns are concatenated, so a backreference
+        # would silently point at another pattern's group
+        if any(_GROUP_REF_RE.search(pattern) for pattern in patterns):
+            return None
+        return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+    except re.error:
+        # e.g. inline global flags or a group name used by two patterns
+        return None
 
 
 @dataclass
@@ -32,12 +142,18 @@ class SourceConfig:
         # Compile regex patterns
         self._allow_regex = [re.compile(pattern) for pattern in self.allow_patterns]
         self._deny_regex = [re.compile(pattern) for pattern in self.deny_patterns]
+        self._allow_union = _compile_union(self.allow_patterns)
+        self._deny_union = _compile_union(self.deny_patterns)
+        self._required_literals = _derive_required_literals(self.allow_patterns)
+        self._url_decisions: Dict[str, bool] = {}
     
     def is_url_allowed(self, url: str) -> bool:
         """Check if URL matches allow patterns."""
         if not self._allow_regex:
             return True
         
+        if self._allow_union is not None:
+            return self._allow_union.search(url) is not None
         return any(regex.search(url) for regex in self._allow_regex)
     
     def is_url_denied(self, url: str) -> bool:
@@ -45,78 +161,146 @@ class SourceConfig:
         if not self._deny_regex:
             return False
         
+        if self._deny_union is not None:
+            return self._deny_union.search(url) is not None
         return any(regex.search(url) for regex in self._deny_regex)
     
+    def may_be_allowed(self, url: str) -> bool:
+        """Check if URL contains a literal some allow pattern requires, e.g. its hostname."""
+        if self._required_literals is None:
+            return True
+        
+        return any(literal in url for literal in self._required_literals)
+    
     def should_process_url(self, url: str) -> bool:
         """Check if URL should be processed."""
-        return self.is_url_allowed(url) and not self.is_url_denied(url)
+        # Cheap substring checks reject off-site links before any regex work
+        if not self.may_be_allowed(url):
+            return False
+        
+        decision = self._url_decisions.get(url)
+        if decision is None:
+            if len(self._url_decisions) >= _MAX_URL_DECISIONS:
+                self._url_decisions.clear()
+            decision = self.is_url_allowed(url) and not self.is_url_denied(url)
+            self._url_decisions[url] = decision
+        return decision
+
+
+@dataclass
+class HarvestedDoc:
+    """A document record together with the content fetched for it."""
+    record: DocumentRecord
+    content: bytes
 
 
 class GenericSpider:
     """Generic spider for crawling sources."""
     
-    def __init__(self, config: SourceConfig, fetcher: AsyncFetcher, robots_checker: RobotsChecker):
+    def __init__(self, config: SourceConfig, fetcher: AsyncFetcher, robots_checker: RobotsChecker,
+                 concurrency: int = 16, per_host_limit: int = 4):
         self.config = config
         self.fetcher = fetcher
         self.robots_checker = robots_checker
+        self.concurrency = concurrency
+        self.per_host_limit = per_host_limit
         self.visited_urls: Set[str] = set()
         self.processed_count = 0
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
     
-    async def crawl(self, max_pages: Optional[int] = None) -> List[DocumentRecord]:
-        """Crawl the source and return document records."""
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Get the concurrency limiter for the URL's host."""
+        host = parse_url(url).netloc
+        if host not in self._host_sems:
+            self._host_sems[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_sems[host]
+    
+    async def crawl(self, max_pages: Optional[int] = None) -> List[HarvestedDoc]:
+        """Crawl the source and return document records with their content."""
         max_pages = max_pages or self.config.max_pages
         documents = []
         
         # BFS queue: (url, depth)
-        queue = [(url, 0) for url in self.config.start_urls]
+        queue: asyncio.Queue = asyncio.Queue()
+        for url in self.config.start_urls:
+            queue.put_nowait((url, 0))
+        
+        async def worker():
+            while True:
+                url, depth = await queue.get()
+                try:
+                    # Once the page limit is reached, drain the queue without fetching
+                    if self.processed_count < max_pages:
+                        await self._process_url(url, depth, max_pages, queue, documents)
+                finally:
+                    queue.task_done()
         
-        while queue and self.processed_count < max_pages:
-            url, depth = queue.pop(0)
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        
+        return documents
+    
+    async def _process_url(self, url: str, depth: int, max_pages: int,
+                           queue: asyncio.Queue, documents: List[HarvestedDoc]):
+        """Fetch a single URL, enqueue its links and collect documents."""
+        try:
+            key = url_key(url)
+            if key in self.visited_urls or depth > self.config.max_depth:
+                return
             
-            if url in self.visited_urls or depth > self.config.max_depth:
-                continue
+            # Check URL patterns
+            if not self.config.should_process_url(url):
+                return
+            
+            # Mark visited before awaiting so other workers skip this URL
+            self.visited_urls.add(key)
             
             # Check robots.txt
-            if not self.robots_checker.is_allowed(url):
-                continue
+            if not await self.robots_checker.is_allowed(url):
+                return
             
-            # Check URL patterns
-            if not self.config.should_process_url(url):
-                continue
-            
-            self.visited_urls.add(url)
-            
-            try:
-                response = await self.fetcher.fetch(url)
-                if not response or response['status_code'] != 200:
-                    continue
-                
-                content = response['content']
-                if not content:
-                    continue
-                
-                filetype = url_filetype(url)
-                
-                if filetype == 'html':
-                    # Extract links for further crawling
-                    links = extract_html_links(content, url)
-                    for link in links:
-                        canonical_link = canonical_url(link, url)
-                        if canonical_link not in self.visited_urls:
-                            queue.append((canonical_link, depth + 1))
-                
-                elif filetype in self.config.filetypes:
-                    # Process document
-                    document = await self._create_document_record(url, content, filetype)
-                    if document:
-                        documents.append(document)
-                        self.processed_count += 1
-                
-            except Exception as e:
-                print(f"Error processing {url}: {e}")
-                continue
-        
-        return documents
+            # Skip types we don't process before spending a GET on them
+            filetype = url_filetype(url)
+            if filetype is not None and filetype != 'html' and filetype not in self.config.filetypes:
+                return
+            
+            # Without an extension the type comes from the response's
+            # Content-Type, checked before its body is downloaded
+            wanted = None if filetype else self.config.filetypes | {'html'}
+            async with self._host_semaphore(url):
+                response = await self.fetcher.fetch(url, filetypes=wanted)
+            if not response or response['status_code'] != 200:
+                return
+            
+            content = response['content']
+            if not content:
+                return
+            
+            if filetype is None:
+                filetype = content_type_filetype(response['headers'].get('content-type', ''))
+            
+            if filetype == 'html':
+                # Extract links for further crawling
+                links = extract_html_links(content, url)
+                for link in links:
+                    canonical_link = canonical_url(link, url)
+                    if url_key(canonical_link) not in self.visited_urls:
+                        queue.put_nowait((canonical_link, depth + 1))
+            
+            elif filetype in self.config.filetypes:
+                # Process document
+                document = await self._create_document_record(url, content, filetype)
+                if document and self.processed_count < max_pages:
+                    documents.append(HarvestedDoc(document, content))
+                    self.processed_count += 1
+            
+        except Exception as e:
+            print(f"Error processing {url}: {e}")
     
     async def _create_document_record(self, url: str, content: bytes, filetype: str) -> Optional[DocumentRecord]:
         """Create DocumentRecord from URL and content."""
@@ -127,9 +311,11 @@ class GenericSpider:
             circular_no = None
             
             if filetype == 'pdf':
-                title, date_str = extract_pdf_metadata(content)
-                if date_str:
-                    published_date = extract_date_from_url(date_str)
+                # PDF text extraction is CPU-bound; keep it off the event loop
+                pdf = await asyncio.to_thread(parse_pdf, content, preview_chars=0)
+                title = pdf.title
+                if pdf.date_str:
+                    published_date = extract_date_from_url(pdf.date_str)
                 if title:
                     circular_no = extract_circular_number(title)
             
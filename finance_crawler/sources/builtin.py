@@ -1,9 +1,15 @@
+from functools import cache
 from typing import Dict, List
 from .base import SourceConfig
 
 
+@cache
 def get_builtin_sources() -> Dict[str, SourceConfig]:
-    """Get built-in source configurations."""
+    """Get built-in source configurations.
+    
+    The result is built once per process and shared between callers, so
+    treat it as read-only; ``.copy()`` it before adding or removing sources.
+    """
     
     sources = {
         "sebi": SourceConfig(
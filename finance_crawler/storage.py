@@ -1,33 +1,241 @@
-import json
+import atexit
+import hashlib
+import mmap
 import os
+import shutil
+import time
+import orjson
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
 from datetime import date
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+from pydantic import TypeAdapter
 from .schema import DocumentRecord
 from .utils import short_title_from_url
 
 
+# Buffered catalog lines are written after this many records or seconds
+CATALOG_FLUSH_RECORDS = 256
+CATALOG_FLUSH_SECONDS = 5.0
+
+# Written catalog lines are synced to disk after this many records or seconds;
+# a crash can lose at most the records written since the last sync
+CATALOG_SYNC_RECORDS = 1000
+CATALOG_SYNC_SECONDS = 5.0
+
+# fdatasync skips the metadata flush; not every platform has it
+_fdatasync = getattr(os, 'fdatasync', os.fsync)
+
+# Serializes a record straight to JSON bytes in pydantic-core, without an
+# intermediate dict
+_dump_record_json = TypeAdapter(DocumentRecord).dump_json
+
+# Catalog stats decode and count lines in batches of this size
+STATS_BATCH_LINES = 4096
+
+# Catalog shards are scanned concurrently by up to this many threads
+STATS_MAX_WORKERS = 8
+
+# Documents at least this large are dropped from the page cache after writing
+FADVISE_MIN_BYTES = 1 << 20
+
+
+def _write_all(fd: int, data: bytes):
+    """Write all of data to fd, retrying short writes."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _record_year(record: DocumentRecord) -> str:
+    """Return the record's publication year, or the current year if undated."""
+    return str(record.published_date.year) if record.published_date else str(date.today().year)
+
+
+def _scan_catalog_file(path: Path) -> Tuple[int, Counter, Counter]:
+    """Count records by source and domain in one catalog file."""
+    total = 0
+    by_source: Counter = Counter()
+    by_domain: Counter = Counter()
+    
+    def count(lines: List[bytes]):
+        nonlocal total
+        records = [orjson.loads(line) for line in lines if line.strip()]
+        total += len(records)
+        # Counter.update over an iterable counts in C
+        by_source.update(record.get("source_org", "unknown") for record in records)
+        by_domain.update(record.get("domain", "unknown") for record in records)
+    
+    # mmap of an empty file is an error; there is nothing to count anyway
+    if path.stat().st_size > 0:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Lines come straight from the mapping as bytes, in bounded batches
+            lines = []
+            for line in iter(mm.readline, b''):
+                lines.append(line)
+                if len(lines) >= STATS_BATCH_LINES:
+                    count(lines)
+                    lines = []
+            count(lines)
+    
+    return total, by_source, by_domain
+
+
+@lru_cache(maxsize=256)
+def _path_prefix(domain: str, source_org: str, year: str) -> str:
+    """Return the <domain>/<source_org>/<YYYY> directory prefix for a document."""
+    return f"{domain}/{source_org.lower().replace(' ', '_')}/{year}"
+
+
 class DocumentStorage:
     """Handles file storage and catalog management."""
     
-    def __init__(self, output_dir: str):
+    def __init__(self, output_dir: str, dry_run: bool = False):
         self.output_dir = Path(output_dir)
-        self.catalog_path = self.output_dir / "catalog.jsonl"
+        # Dry runs leave existing catalog and index files untouched
+        self.dry_run = dry_run
+        self.catalog_dir = self.output_dir / "catalog"
+        self.content_index_path = self.output_dir / "content_index.tsv"
+        # Open append handles and buffered lines, per catalog year shard
+        self._catalog_fhs: Dict[str, Any] = {}
+        self._index_fh = None
+        self._catalog_bufs: Dict[str, List[bytes]] = {}
+        self._catalog_buffered = 0
+        self._unsynced: set = set()
+        self._last_flush = time.monotonic()
+        self._pending_since_fsync = 0
+        self._last_fsync = time.monotonic()
         self._ensure_output_dir()
+        if not dry_run:
+            self._migrate_legacy_catalog()
+        self._content_index = self._load_content_index()
+        # Storage path -> digest of the content it holds
+        self._path_digests = {path: digest for digest, (_, path) in self._content_index.items()}
+        atexit.register(self.close)
+    
+    def __enter__(self) -> "DocumentStorage":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
     
     def _ensure_output_dir(self):
         """Create output directory if it doesn't exist."""
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
+    def _migrate_legacy_catalog(self):
+        """Split a catalog.jsonl written before year sharding into shards."""
+        legacy_path = self.output_dir / "catalog.jsonl"
+        if not legacy_path.exists():
+            return
+        
+        # Shards are built aside and renamed into place in one step, so an
+        # interrupted migration is redone rather than duplicating lines
+        if not self.catalog_dir.exists():
+            tmp_dir = self.output_dir / "catalog.tmp"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            tmp_dir.mkdir()
+            shards: Dict[str, Any] = {}
+            try:
+                with open(legacy_path, 'rb') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            published = orjson.loads(line).get("published_date")
+                        except orjson.JSONDecodeError:
+                            published = None
+                        year = published[:4] if published else str(date.today().year)
+                        if year not in shards:
+                            shards[year] = open(tmp_dir / f"{year}.jsonl", 'wb')
+                        shards[year].write(line if line.endswith(b'\n') else line + b'\n')
+            finally:
+                for fh in shards.values():
+                    fh.close()
+            os.rename(tmp_dir, self.catalog_dir)
+        
+        legacy_path.rename(legacy_path.with_name("catalog.jsonl.migrated"))
+        print(f"Migrated {legacy_path} to per-year shards in {self.catalog_dir}")
+    
+    def _catalog_path_for(self, year: str) -> Path:
+        """Return the catalog shard path for a publication year."""
+        return self.catalog_dir / f"{year}.jsonl"
+    
+    def _load_content_index(self) -> Dict[bytes, Tuple[str, str]]:
+        """Load content digest -> (document id, storage path) index.
+        
+        The file is an append-only log: later lines override earlier ones and
+        a line with an empty path removes its digest. Logs with overridden or
+        removed entries are compacted on load.
+        """
+        index = {}
+        if not self.content_index_path.exists():
+            return index
+        
+        lines = 0
+        with open(self.content_index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) == 3:
+                    lines += 1
+                    digest, doc_id, storage_path = parts
+                    if storage_path:
+                        index[bytes.fromhex(digest)] = (doc_id, storage_path)
+                    else:
+                        index.pop(bytes.fromhex(digest), None)
+        
+        if lines > len(index) and not self.dry_run:
+            tmp_path = self.content_index_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(f"{digest.hex()}\t{doc_id}\t{storage_path}\n"
+                             for digest, (doc_id, storage_path) in index.items())
+            os.replace(tmp_path, self.content_index_path)
+        return index
+    
+    def _index_content(self, digest: bytes, record: DocumentRecord):
+        """Record content written to record.storage_path in the in-memory and on-disk index.
+        
+        Content previously stored at that path is dropped from the index, since
+        the file no longer holds it.
+        """
+        storage_path = record.storage_path
+        lines = []
+        
+        replaced = self._path_digests.get(storage_path)
+        if replaced is not None and replaced != digest:
+            if self._content_index.get(replaced, (None, None))[1] == storage_path:
+                del self._content_index[replaced]
+                lines.append(f"{replaced.hex()}\t\t\n")
+        
+        # The same content indexed under another path now lives here instead
+        previous = self._content_index.get(digest)
+        if previous is not None and self._path_digests.get(previous[1]) == digest:
+            del self._path_digests[previous[1]]
+        
+        self._content_index[digest] = (record.id, storage_path)
+        self._path_digests[storage_path] = digest
+        lines.append(f"{digest.hex()}\t{record.id}\t{storage_path}\n")
+        
+        if self._index_fh is None:
+            self._index_fh = open(self.content_index_path, 'a', encoding='utf-8')
+        self._index_fh.writelines(lines)
+    
+    def _holds_content(self, storage_path: str, size: int) -> bool:
+        """Check that a stored file still exists with the expected size."""
+        try:
+            return (self.output_dir / storage_path).stat().st_size == size
+        except OSError:
+            return False
+    
     def _generate_storage_path(self, record: DocumentRecord) -> str:
         """Generate storage path for document."""
         # Format: <domain>/<source_org>/<YYYY>/<type>__<short-title>__<YYYY-MM-DD|undated>.<ext>
         
-        domain = record.domain
-        source_org = record.source_org.lower().replace(' ', '_')
-        
         # Get year from published_date or current year
-        year = str(record.published_date.year) if record.published_date else str(date.today().year)
+        year = _record_year(record)
         
         # Generate short title
         short_title = short_title_from_url(record.source_url)
@@ -42,10 +250,15 @@ class DocumentStorage:
         
         filename = f"{record.file_type}__{short_title}__{date_str}.{ext}"
         
-        return f"{domain}/{source_org}/{year}/{filename}"
+        return f"{_path_prefix(record.domain, record.source_org, year)}/{filename}"
     
-    def save_document(self, record: DocumentRecord, content: bytes, dry_run: bool = False) -> bool:
-        """Save document file and catalog entry."""
+    def save_document(self, record: DocumentRecord, content: bytes, dry_run: bool = False,
+                      catalog: bool = True) -> bool:
+        """Save document file and catalog entry.
+        
+        With ``catalog=False`` only the file is written; the caller is
+        expected to pass the record to ``append_catalog`` later.
+        """
         if dry_run:
             print(f"DRY RUN: Would save {record.source_url} to {record.storage_path}")
             return True
@@ -58,20 +271,34 @@ class DocumentStorage:
         file_path = self.output_dir / storage_path
         file_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Check if file already exists with same size
-        if file_path.exists() and file_path.stat().st_size == len(content):
-            print(f"File already exists with same size: {file_path}")
+        # Identical content already stored under another path: point at it
+        digest = hashlib.blake2b(content, digest_size=16).digest()
+        indexed = self._content_index.get(digest)
+        if indexed and indexed[1] != storage_path and self._holds_content(indexed[1], len(content)):
+            original_id, original_path = indexed
+            record.storage_path = original_path
+            record.duplicate_of = original_id
+            print(f"Duplicate content of {original_path}: {record.source_url}")
+            if catalog:
+                self.append_catalog([record])
+            return True
+        
+        # Same content already stored at this path; only an index hit needs the stat
+        if self._path_digests.get(storage_path) == digest and file_path.exists():
+            print(f"File already exists with same content: {file_path}")
             # Still add to catalog
-            self._append_to_catalog(record)
+            if catalog:
+                self.append_catalog([record])
             return True
         
         try:
             # Write file
-            with open(file_path, 'wb') as f:
-                f.write(content)
+            self._write_file(file_path, content)
+            self._index_content(digest, record)
             
             # Add to catalog
-            self._append_to_catalog(record)
+            if catalog:
+                self.append_catalog([record])
             
             print(f"Saved: {file_path}")
             return True
@@ -80,42 +307,105 @@ class DocumentStorage:
             print(f"Error saving file {file_path}: {e}")
             return False
     
-    def _append_to_catalog(self, record: DocumentRecord):
-        """Append record to catalog.jsonl."""
+    def _write_file(self, file_path: Path, content: bytes):
+        """Write document content without stdio buffering."""
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
         try:
-            with open(self.catalog_path, 'a', encoding='utf-8') as f:
-                json.dump(record.model_dump(), f, ensure_ascii=False, default=str)
-                f.write('\n')
+            _write_all(fd, content)
+            # Documents are write-once here; don't let them evict hotter pages
+            if len(content) >= FADVISE_MIN_BYTES and hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(fd, 0, len(content), os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    
+    def append_catalog(self, records: List[DocumentRecord]):
+        """Buffer records for their catalog year shard, writing them out in batches."""
+        try:
+            for record in records:
+                line = _dump_record_json(record) + b'\n'
+                self._catalog_bufs.setdefault(_record_year(record), []).append(line)
+                self._catalog_buffered += 1
+        except Exception as e:
+            print(f"Error serializing catalog record: {e}")
+        
+        if (self._catalog_buffered >= CATALOG_FLUSH_RECORDS
+                or time.monotonic() - self._last_flush >= CATALOG_FLUSH_SECONDS):
+            self.flush()
+    
+    def flush(self):
+        """Write buffered catalog lines with a single write call per shard."""
+        self._last_flush = time.monotonic()
+        if not self._catalog_buffered:
+            return
+        try:
+            for year, buf in self._catalog_bufs.items():
+                if not buf:
+                    continue
+                fh = self._catalog_fhs.get(year)
+                if fh is None:
+                    self.catalog_dir.mkdir(exist_ok=True)
+                    fh = self._catalog_fhs[year] = open(self._catalog_path_for(year), 'ab', buffering=0)
+                _write_all(fh.fileno(), b''.join(buf))
+                self._pending_since_fsync += len(buf)
+                self._catalog_buffered -= len(buf)
+                self._unsynced.add(year)
+                buf.clear()
+            if (self._pending_since_fsync >= CATALOG_SYNC_RECORDS
+                    or time.monotonic() - self._last_fsync >= CATALOG_SYNC_SECONDS):
+                self._sync_catalog()
         except Exception as e:
             print(f"Error writing to catalog: {e}")
     
-    def get_catalog_stats(self) -> Dict[str, Any]:
-        """Get statistics from catalog."""
-        if not self.catalog_path.exists():
-            return {"total_documents": 0, "by_source": {}, "by_domain": {}}
+    def _sync_catalog(self):
+        """Sync written catalog lines to disk in one group."""
+        self._last_fsync = time.monotonic()
+        try:
+            for year in list(self._unsynced):
+                _fdatasync(self._catalog_fhs[year].fileno())
+                self._unsynced.discard(year)
+            self._pending_since_fsync = 0
+        except Exception as e:
+            print(f"Error syncing catalog: {e}")
+    
+    def close(self):
+        """Flush and sync catalog lines, then close the catalog and index files."""
+        # Closed storage no longer needs the exit hook keeping it alive
+        atexit.unregister(self.close)
+        self.flush()
+        self._sync_catalog()
+        for fh in self._catalog_fhs.values():
+            fh.close()
+        self._catalog_fhs.clear()
+        if self._index_fh is not None:
+            self._index_fh.close()
+            self._index_fh = None
+    
+    def get_catalog_stats(self, years: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+        """Get statistics from catalog, optionally limited to some years."""
+        self.flush()
         
-        stats = {
-            "total_documents": 0,
-            "by_source": {},
-            "by_domain": {}
-        }
+        if years is None:
+            paths = sorted(self.catalog_dir.glob("*.jsonl"))
+        else:
+            paths = [path for path in (self._catalog_path_for(str(year)) for year in years)
+                     if path.exists()]
+        
+        total = 0
+        by_source: Counter = Counter()
+        by_domain: Counter = Counter()
         
         try:
-            with open(self.catalog_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if line.strip():
-                        record_data = json.loads(line)
-                        stats["total_documents"] += 1
-                        
-                        # Count by source
-                        source = record_data.get("source_org", "unknown")
-                        stats["by_source"][source] = stats["by_source"].get(source, 0) + 1
-                        
-                        # Count by domain
-                        domain = record_data.get("domain", "unknown")
-                        stats["by_domain"][domain] = stats["by_domain"].get(domain, 0) + 1
-                        
+            with ThreadPoolExecutor(max_workers=min(STATS_MAX_WORKERS, len(paths) or 1)) as pool:
+                for shard_total, shard_sources, shard_domains in pool.map(_scan_catalog_file, paths):
+                    total += shard_total
+                    by_source.update(shard_sources)
+                    by_domain.update(shard_domains)
+        
         except Exception as e:
             print(f"Error reading catalog stats: {e}")
         
-        return stats
+        return {
+            "total_documents": total,
+            "by_source": dict(by_source),
+            "by_domain": dict(by_domain)
+        }
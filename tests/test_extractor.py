@@ -0,0 +1,77 @@
+import pytest
+from datetime import date
+from finance_crawler.extractor import (
+    parse_date_string, extract_date_from_url, extract_circular_number, extract_topic_tags
+)
+from finance_crawler.parser_pdf import extract_date_from_text
+
+
+def test_parse_date_string():
+    """Test date string parsing."""
+    assert parse_date_string("2024-03-15") == date(2024, 3, 15)
+    assert parse_date_string("2024/03/15") == date(2024, 3, 15)
+    assert parse_date_string("2024") == date(2024, 1, 1)
+    assert parse_date_string("") is None
+    assert parse_date_string(None) is None
+
+
+def test_parse_date_string_formats():
+    """Test day-first and month/year formats."""
+    assert parse_date_string("15-03-2024") == date(2024, 3, 15)
+    assert parse_date_string("15/03/2024") == date(2024, 3, 15)
+    assert parse_date_string("03/2024") == date(2024, 3, 1)
+    
+    # Invalid full dates fall back to the year
+    assert parse_date_string("2024-13-45") == date(2024, 1, 1)
+
+
+def test_parse_date_string_prefers_full_dates():
+    """Test that a full date wins over a bare year appearing before it."""
+    assert parse_date_string("2023 report 2024-03-15") == date(2024, 3, 15)
+    assert parse_date_string("2023 report 15/03/2024") == date(2024, 3, 15)
+    assert parse_date_string("2023 report 03/2024") == date(2024, 3, 1)
+    assert parse_date_string("2023-13-45 report 2024") == date(2023, 1, 1)
+
+
+def test_parse_date_string_skips_slugs():
+    """Test that segments without digits are not treated as dates."""
+    assert parse_date_string("circulars") is None
+    assert parse_date_string("may") is None
+    assert parse_date_string("investor-awareness") is None
+
+
+def test_extract_date_from_url():
+    """Test date extraction from URL path and query."""
+    assert extract_date_from_url("https://example.com/circulars/2023/doc.pdf") == date(2023, 1, 1)
+    assert extract_date_from_url("https://example.com/view?date=2022-05-10") == date(2022, 5, 10)
+
+
+def test_extract_circular_number():
+    """Test circular number extraction."""
+    assert extract_circular_number("Circular No. SEBI/HO/2024/01") == "SEBI/HO/2024/01"
+    assert extract_circular_number("Notification No 12/2023") == "12/2023"
+    assert extract_circular_number("") is None
+
+
+def test_extract_topic_tags():
+    """Test topic tag extraction."""
+    tags = extract_topic_tags("", "Mutual Fund NAV guide")
+    assert "mutual_funds" in tags
+    assert "education" in tags
+    
+    assert extract_topic_tags("", "Sovereign Gold Bond") == ["gold"]
+    assert len(extract_topic_tags("tax stock gold bank sebi insurance guide nav")) <= 5
+
+
+def test_extract_date_from_text():
+    """Test date extraction from PDF text."""
+    assert extract_date_from_text("Dated 15/03/2024 issued") == "15/03/2024"
+    assert extract_date_from_text("Issued on 5 Mar 2024") == "5 Mar 2024"
+    assert extract_date_from_text("Issued on mar 5, 2024") == "mar 5, 2024"
+    assert extract_date_from_text("") is None
+
+
+def test_extract_topic_tags_shared_keyword():
+    """Test that a keyword shared by several topics tags all of them."""
+    tags = extract_topic_tags("RBI notice")
+    assert tags == ["banking", "regulatory"]
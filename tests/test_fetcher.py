@@ -0,0 +1,101 @@
+import asyncio
+import httpx
+import pytest
+from finance_crawler.fetcher import AsyncFetcher
+
+
+def make_fetcher(tmp_path, handler, **kwargs) -> AsyncFetcher:
+    """Build a fetcher whose requests are answered by handler."""
+    return AsyncFetcher(str(tmp_path / "cache.db"), transport=httpx.MockTransport(handler), **kwargs)
+
+
+def etag_handler(requests: list):
+    """Serve every URL with an ETag, answering revalidations with 304."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"etag": '"v1"'}, content=b"body")
+    return handler
+
+
+def cached_urls(fetcher: AsyncFetcher) -> list:
+    """List URLs written to the cache table."""
+    return [row[0] for row in fetcher._conn.execute("SELECT url FROM cache ORDER BY url")]
+
+
+def test_cache_entries_queued_until_flush(tmp_path, monkeypatch):
+    """Test that cache writes are queued, served from the queue and written on close."""
+    monkeypatch.setattr("finance_crawler.fetcher.CACHE_FLUSH_SECONDS", 3600)
+    requests = []
+    
+    async def run():
+        fetcher = make_fetcher(tmp_path, etag_handler(requests))
+        first = await fetcher.fetch("https://example.com/a.pdf")
+        assert first["content"] == b"body"
+        assert cached_urls(fetcher) == []
+        
+        # The queued entry is used for revalidation before it is written
+        second = await fetcher.fetch("https://example.com/a.pdf")
+        assert second["cached"] is True
+        await fetcher.aclose()
+    
+    asyncio.run(run())
+    assert requests[1].headers["if-none-match"] == '"v1"'
+    
+    fetcher = AsyncFetcher(str(tmp_path / "cache.db"))
+    assert cached_urls(fetcher) == ["https://example.com/a.pdf"]
+    assert fetcher._get_cache_entry("https://example.com/a.pdf").etag == '"v1"'
+    asyncio.run(fetcher.aclose())
+
+
+def test_cache_entries_flushed_in_batches(tmp_path, monkeypatch):
+    """Test that queued cache entries are written once the batch is full."""
+    monkeypatch.setattr("finance_crawler.fetcher.CACHE_FLUSH_SECONDS", 3600)
+    monkeypatch.setattr("finance_crawler.fetcher.CACHE_FLUSH_ROWS", 2)
+    
+    async def run():
+        async with make_fetcher(tmp_path, etag_handler([])) as fetcher:
+            await fetcher.fetch("https://example.com/a.pdf")
+            assert cached_urls(fetcher) == []
+            await fetcher.fetch("https://example.com/b.pdf")
+            assert cached_urls(fetcher) == ["https://example.com/a.pdf", "https://example.com/b.pdf"]
+            assert fetcher._pending == {}
+    
+    asyncio.run(run())
+
+
+def sized_handler(body: bytes, send_length: bool):
+    """Serve body with or without a Content-Length header."""
+    async def chunks():
+        for i in range(0, len(body), 4):
+            yield body[i:i + 4]
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        if send_length:
+            return httpx.Response(200, content=body)
+        return httpx.Response(200, content=chunks())
+    return handler
+
+
+@pytest.mark.parametrize("send_length", [True, False])
+def test_fetch_skips_oversize_body(tmp_path, send_length):
+    """Test that bodies over max_bytes are skipped and not cached."""
+    async def run():
+        async with make_fetcher(tmp_path, sized_handler(b"x" * 17, send_length), max_bytes=16) as fetcher:
+            response = await fetcher.fetch("https://example.com/big.pdf")
+            return response, fetcher._get_cache_entry("https://example.com/big.pdf")
+    
+    response, cache_entry = asyncio.run(run())
+    assert response is None
+    assert cache_entry is None
+
+
+@pytest.mark.parametrize("send_length", [True, False])
+def test_fetch_body_at_limit(tmp_path, send_length):
+    """Test that a body of exactly max_bytes is returned whole."""
+    async def run():
+        async with make_fetcher(tmp_path, sized_handler(b"x" * 16, send_length), max_bytes=16) as fetcher:
+            return await fetcher.fetch("https://example.com/doc.pdf")
+    
+    assert asyncio.run(run())["content"] == b"x" * 16
@@ -0,0 +1,49 @@
+import pytest
+from finance_crawler.parser_html import (
+    parse_html, extract_html_links, extract_html_title, extract_html_meta_description
+)
+
+
+SAMPLE_HTML = b"""
+<html>
+  <head>
+    <title> Investor Resources </title>
+    <meta name="description" content=" Circulars and guides ">
+  </head>
+  <body>
+    <a href="/docs/guide.pdf">Guide</a>
+    <a href="circular.html">Circular</a>
+    <a href="https://other.com/data.csv">Data</a>
+    <a>No link</a>
+  </body>
+</html>
+"""
+
+
+def test_parse_html():
+    """Test links, title and meta description from a single parse."""
+    result = parse_html(SAMPLE_HTML, "https://example.com/investors/")
+    
+    assert result.links == [
+        "https://example.com/docs/guide.pdf",
+        "https://example.com/investors/circular.html",
+        "https://other.com/data.csv",
+    ]
+    assert result.title == "Investor Resources"
+    assert result.meta_description == "Circulars and guides"
+
+
+def test_parse_html_missing_fields():
+    """Test pages without title, meta description or links."""
+    result = parse_html(b"<html><body><p>Text</p></body></html>", "https://example.com/")
+    
+    assert result.links == []
+    assert result.title is None
+    assert result.meta_description is None
+
+
+def test_html_helpers():
+    """Test single-field helpers."""
+    assert extract_html_links(SAMPLE_HTML, "https://example.com/")[0] == "https://example.com/docs/guide.pdf"
+    assert extract_html_title(SAMPLE_HTML) == "Investor Resources"
+    assert extract_html_meta_description(SAMPLE_HTML) == "Circulars and guides"
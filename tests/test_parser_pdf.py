@@ -0,0 +1,109 @@
+import pytest
+from finance_crawler import parser_pdf
+from finance_crawler.parser_pdf import (
+    parse_pdf, extract_pdf_metadata, extract_pdf_text_preview
+)
+
+
+def make_pdf(text: str, title: str = None) -> bytes:
+    """Build a minimal single-page PDF with the given text."""
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    if title:
+        objects.append(f"<< /Title ({title}) >>".encode())
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    trailer = b"<< /Size %d /Root 1 0 R" % (len(objects) + 1)
+    if title:
+        trailer += b" /Info %d 0 R" % len(objects)
+    out += b"trailer\n" + trailer + b" >>\nstartxref\n%d\n%%%%EOF\n" % xref
+    return out
+
+
+def test_parse_pdf_from_page_text():
+    """Test title and date extraction from first page text."""
+    result = parse_pdf(make_pdf("Investor Guide dated 15/03/2024"))
+    
+    assert result.title == "Investor Guide dated 15/03/2024"
+    assert result.date_str == "15/03/2024"
+    assert result.preview == "Investor Guide dated 15/03/2024"
+
+
+def test_parse_pdf_metadata_title():
+    """Test that metadata title takes precedence over page text."""
+    result = parse_pdf(make_pdf("Investor Guide dated 15/03/2024", title="Official Title"))
+    
+    assert result.title == "Official Title"
+    assert result.date_str == "15/03/2024"
+
+
+def test_parse_pdf_skip_preview():
+    """Test that preview extraction can be skipped."""
+    result = parse_pdf(make_pdf("Investor Guide"), preview_chars=0)
+    assert result.preview is None
+
+
+def test_parse_pdf_invalid_content():
+    """Test that invalid content yields empty results."""
+    result = parse_pdf(b"not a pdf")
+    assert result.title is None
+    assert result.date_str is None
+    assert result.preview is None
+
+
+def test_pdf_helpers():
+    """Test metadata and preview helpers."""
+    content = make_pdf("Investor Guide dated 15/03/2024")
+    
+    assert extract_pdf_metadata(content) == ("Investor Guide dated 15/03/2024", "15/03/2024")
+    assert extract_pdf_text_preview(content, max_chars=8) == "Investor..."
+
+
+def test_parse_pdf_pypdf_fallback(monkeypatch):
+    """Test extraction without PyMuPDF installed."""
+    monkeypatch.setattr(parser_pdf, "pymupdf", None)
+    
+    result = parse_pdf(make_pdf("Investor Guide dated 15/03/2024", title="Official Title"))
+    assert result.title == "Official Title"
+    assert result.date_str == "15/03/2024"
+    assert result.preview == "Investor Guide dated 15/03/2024"
+    
+    assert parse_pdf(b"not a pdf").title is None
+
+
+def test_parse_pdf_mupdf_serialized(monkeypatch):
+    """Test that PyMuPDF is only entered while holding the module lock."""
+    class FakeDoc:
+        metadata = {"title": "Locked Title"}
+        page_count = 0
+        
+        def __enter__(self):
+            return self
+        
+        def __exit__(self, *exc):
+            return False
+    
+    class FakeMupdf:
+        @staticmethod
+        def open(stream, filetype):
+            assert parser_pdf._MUPDF_LOCK.locked()
+            return FakeDoc()
+    
+    monkeypatch.setattr(parser_pdf, "pymupdf", FakeMupdf)
+    
+    assert parse_pdf(b"%PDF-1.4").title == "Locked Title"
+    assert not parser_pdf._MUPDF_LOCK.locked()
@@ -0,0 +1,99 @@
+import asyncio
+import httpx
+import pytest
+from datetime import timedelta
+from finance_crawler.fetcher import AsyncFetcher
+from finance_crawler.robots import RobotsChecker
+
+
+ROBOTS_TXT = b"User-agent: *\nDisallow: /private\n"
+
+
+def make_fetcher(tmp_path, handler) -> AsyncFetcher:
+    """Build a fetcher whose requests are answered by handler."""
+    return AsyncFetcher(str(tmp_path / "cache.db"), transport=httpx.MockTransport(handler))
+
+
+def robots_handler(requests: list, status: int = 200):
+    """Serve ROBOTS_TXT with an ETag, answering revalidations with 304."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if status != 200:
+            return httpx.Response(status)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"etag": '"v1"'}, content=ROBOTS_TXT)
+    return handler
+
+
+def test_robots_rules_applied_and_persisted(tmp_path):
+    """Test that fetched rules are applied and reused from the robots table."""
+    requests = []
+    
+    async def run():
+        async with make_fetcher(tmp_path, robots_handler(requests)) as fetcher:
+            checker = RobotsChecker(fetcher)
+            assert await checker.is_allowed("https://example.com/private/doc.pdf") is False
+            assert await checker.is_allowed("https://example.com/public/doc.pdf") is True
+            assert fetcher.get_robots_entry("https://example.com")[0] == ROBOTS_TXT.decode()
+            
+            # A new checker loads the stored rules without fetching again
+            checker = RobotsChecker(fetcher)
+            assert await checker.is_allowed("https://example.com/private/doc.pdf") is False
+    
+    asyncio.run(run())
+    assert len(requests) == 1
+
+
+def test_robots_reused_after_not_modified(tmp_path):
+    """Test that stale stored rules are revalidated and reused on a 304."""
+    requests = []
+    
+    async def run():
+        async with make_fetcher(tmp_path, robots_handler(requests)) as fetcher:
+            await RobotsChecker(fetcher).is_allowed("https://example.com/")
+            
+            checker = RobotsChecker(fetcher, max_age=timedelta(0))
+            assert await checker.is_allowed("https://example.com/private/doc.pdf") is False
+    
+    asyncio.run(run())
+    assert len(requests) == 2
+    assert requests[1].headers["if-none-match"] == '"v1"'
+
+
+@pytest.mark.parametrize("status", [401, 403])
+def test_robots_unauthorized_disallows_all(tmp_path, status):
+    """Test that an unauthorized robots.txt disallows the whole host."""
+    async def run():
+        async with make_fetcher(tmp_path, robots_handler([], status)) as fetcher:
+            return await RobotsChecker(fetcher).is_allowed("https://example.com/public/doc.pdf")
+    
+    assert asyncio.run(run()) is False
+
+
+def test_robots_missing_allows_all(tmp_path):
+    """Test that a missing robots.txt allows everything."""
+    async def run():
+        async with make_fetcher(tmp_path, robots_handler([], 404)) as fetcher:
+            return await RobotsChecker(fetcher).is_allowed("https://example.com/private/doc.pdf")
+    
+    assert asyncio.run(run()) is True
+
+
+def test_robots_lru_eviction(tmp_path):
+    """Test that only max_hosts parsers are kept, evicting the least recently used."""
+    requests = []
+    
+    async def run():
+        async with make_fetcher(tmp_path, robots_handler(requests)) as fetcher:
+            checker = RobotsChecker(fetcher, max_hosts=2)
+            for host in ("a.com", "b.com", "a.com", "c.com"):
+                await checker.is_allowed(f"https://{host}/doc.pdf")
+            assert list(checker._robots_cache) == ["https://a.com", "https://c.com"]
+            
+            # An evicted host is rebuilt from the robots table, not refetched
+            assert await checker.is_allowed("https://b.com/private/doc.pdf") is False
+            assert list(checker._robots_cache) == ["https://c.com", "https://b.com"]
+    
+    asyncio.run(run())
+    assert [request.url.host for request in requests] == ["a.com", "b.com", "c.com"]
@@ -1,6 +1,6 @@
 import pytest
 from finance_crawler.sources.builtin import get_builtin_sources, get_source_names
-from finance_crawler.sources.base import SourceConfig
+from finance_crawler.sources.base import SourceConfig, _compile_union, _literal_prefix
 
 
 def test_get_builtin_sources():
@@ -108,6 +108,26 @@ def test_source_config_url_filtering():
     assert config.should_process_url("https://example.com/page.html") is False
 
 
+def test_source_config_url_decisions_memoized():
+    """Test that repeated URL checks reuse the cached decision."""
+    config = SourceConfig(
+        name="Test",
+        domain_tag="stock_equity",
+        source_org="Test",
+        start_urls=["https://example.com"],
+        allow_patterns=[r"example\.com/.+\.pdf$"],
+        deny_patterns=[r"login"]
+    )
+    
+    assert config.should_process_url("https://example.com/doc.pdf") is True
+    assert config.should_process_url("https://example.com/login.pdf") is False
+    assert config._url_decisions == {
+        "https://example.com/doc.pdf": True,
+        "https://example.com/login.pdf": False,
+    }
+    assert config.should_process_url("https://example.com/doc.pdf") is True
+
+
 def test_get_source_names():
     """Test source names list."""
     names = get_source_names()
@@ -135,3 +155,148 @@ def test_source_config_regex_compilation():
     # Test regex matching
     assert config._allow_regex[0].search("https://example.com/doc.pdf") is not None
     assert config._deny_regex[0].search("https://example.com/login") is not None
+
+
+def test_source_config_fused_patterns():
+    """Test that multiple patterns are fused into one regex per list."""
+    config = SourceConfig(
+        name="Test",
+        domain_tag="stock_equity",
+        source_org="Test",
+        start_urls=["https://example.com"],
+        allow_patterns=[r"example\.com/.+\.pdf$", r"example\.org/.+\.csv$"],
+        deny_patterns=[r"login", r"admin"]
+    )
+    
+    assert config._allow_union is not None
+    assert config._deny_union is not None
+    
+    assert config.is_url_allowed("https://example.com/doc.pdf") is True
+    assert config.is_url_allowed("https://example.org/data.csv") is True
+    assert config.is_url_allowed("https://example.org/data.pdf") is False
+    assert config.is_url_denied("https://example.com/admin/doc.pdf") is True
+    assert config.is_url_denied("https://example.com/doc.pdf") is False
+
+
+def test_source_config_unfusable_patterns():
+    """Test fallback to per-pattern matching when patterns can't be fused."""
+    config = SourceConfig(
+        name="Test",
+        domain_tag="stock_equity",
+        source_org="Test",
+        start_urls=["https://example.com"],
+        allow_patterns=[r"(?i)example\.com/.+\.pdf$", r"(a)\1"],
+        deny_patterns=[]
+    )
+    
+    assert config._allow_union is None
+    assert config.is_url_allowed("https://EXAMPLE.com/doc.pdf") is True
+    assert config.is_url_allowed("https://other.com/aa") is True
+    assert config.is_url_allowed("https://other.com/doc.pdf") is False
+    
+    # Fusing would renumber groups and point the backreference at (x)
+    config = SourceConfig(
+        name="Test",
+        domain_tag="stock_equity",
+        source_org="Test",
+        start_urls=["https://example.com"],
+        allow_patterns=[r"(x)y", r"(a)\1"],
+        deny_patterns=[]
+    )
+    
+    assert config._allow_union is None
+    assert config.is_url_allowed("https://other.com/aa") is True
+    assert config.is_url_allowed("https://other.com/ab") is False
+
+
+@pytest.mark.parametrize("patterns,fused", [
+    ([r"(x)y", r"(a)\1"], False),
+    ([r"(x)y", r"(?P<n>a)(?P=n)"], False),
+    ([r"(a)?(?(1)b|c)"], False),
+    ([r"sebi\.gov\.in/.+\.(pdf|csv|xlsx)$", r"login|careers"], True),
+])
+def test_compile_union_group_refs(patterns, fused):
+    """Test that patterns referring to groups by number or name aren't fused."""
+    assert (_compile_union(patterns) is not None) is fused
+
+
+def test_source_config_host_prefilter():
+    """Test that off-site URLs are rejected by host before regex matching."""
+    config = SourceConfig(
+        name="Test",
+        domain_tag="stock_equity",
+        source_org="Test",
+        start_urls=["https://www.example.com/index.html"],
+        allow_patterns=[r"example\.com/.+\.pdf$"],
+        deny_patterns=[]
+    )
+    
+    assert config._required_literals == frozenset({"example.com/"})
+    assert config.may_be_allowed("https://docs.example.com/a.pdf") is True
+    assert config.should_process_url("https://other.com/a.pdf") is False
+    assert "https://other.com/a.pdf" not in config._url_decisions
+    # The prefilter never rejects a URL the regex accepts
+    assert config.should_process_url("https://other.com/example.com/a.pdf") is True
+
+
+def test_source_config_host_prefilter_alternation():
+    """Test that a top-level alternation across hosts disables the prefilter."""
+    config = SourceConfig(
+        name="Test",
+        domain_tag="stock_equity",
+        source_org="Test",
+        start_urls=["https://a.com"],
+        allow_patterns=[r"a\.com/.+\.pdf$|b\.com/.+\.pdf$"],
+        deny_patterns=[]
+    )
+    
+    assert config._required_literals is None
+    assert config.is_url_allowed("https://b.com/x.pdf") is True
+    assert config.should_process_url("https://b.com/x.pdf") is True
+
+
+def test_builtin_sources_required_literals():
+    """Test the literals derived from the builtin allow patterns."""
+    sources = get_builtin_sources()
+    
+    assert sources["sebi"]._required_literals == frozenset({"sebi.gov.in/"})
+    assert sources["nse"]._required_literals == frozenset({"nseindia.com/"})
+    assert sources["amfi"]._required_literals == frozenset({"amfiindia.com/"})
+    assert sources["rbi_sgb"]._required_literals == frozenset({"rbi.org.in/"})
+    assert sources["income_tax"]._required_literals is None
+
+
+@pytest.mark.parametrize("pattern,literal", [
+    (r"example\.com/.+\.pdf$", "example.com/"),
+    (r"example\.com/?x", "example.com"),
+    (r"example\.com/(a|b)", "example.com/"),
+    (r"example\.com/[|]x", "example.com/"),
+    (r"example\.com/\|x", "example.com/|x"),
+    (r"example\.com/\d+", "example.com/"),
+    (r"a\.com/x|a\.com/y", ""),
+    (r"(?i)example\.com/", ""),
+])
+def test_literal_prefix(pattern, literal):
+    """Test the required literal scanned from the start of a pattern."""
+    assert _literal_prefix(pattern) == literal
+
+
+def test_source_config_no_host_prefilter():
+    """Test that patterns not anchored on a host disable the prefilter."""
+    config = SourceConfig(
+        name="Test",
+        domain_tag="taxation",
+        source_org="Test",
+        start_urls=["https://example.gov.in"],
+        allow_patterns=[r"(example|sample)\.gov\.in/.+\.pdf$"],
+        deny_patterns=[]
+    )
+    
+    assert config._required_literals is None
+    assert config.should_process_url("https://sample.gov.in/doc.pdf") is True
+
+
+def test_get_builtin_sources_cached():
+    """Test that builtin sources are built once and shared."""
+    assert get_builtin_sources() is get_builtin_sources()
+    assert get_builtin_sources()["sebi"] is get_builtin_sources()["sebi"]
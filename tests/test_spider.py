@@ -0,0 +1,116 @@
+import asyncio
+import httpx
+from collections import Counter
+from finance_crawler.fetcher import AsyncFetcher
+from finance_crawler.robots import RobotsChecker
+from finance_crawler.sources.base import SourceConfig, GenericSpider
+
+
+def html_page(*links: str) -> bytes:
+    """Build an HTML page linking to the given hrefs."""
+    anchors = "".join(f'<a href="{link}">link</a>' for link in links)
+    return f"<html><head><title>Index</title></head><body>{anchors}</body></html>".encode()
+
+
+# Site map: path -> (content type, body)
+SITE = {
+    "/": ("text/html", html_page("/a.pdf", "/a.pdf?utm_source=feed", "/b.pdf", "/sub.html")),
+    "/sub.html": ("text/html", html_page("/a.pdf", "/c.pdf", "/deep.html")),
+    "/deep.html": ("text/html", html_page("/d.pdf")),
+    "/a.pdf": ("application/pdf", b"%PDF-1.4 a"),
+    "/b.pdf": ("application/pdf", b"%PDF-1.4 b"),
+    "/c.pdf": ("application/pdf", b"%PDF-1.4 c"),
+    "/d.pdf": ("application/pdf", b"%PDF-1.4 d"),
+}
+
+
+def make_spider(tmp_path, requests: Counter, max_depth: int = 2, robots_checker=None,
+                concurrency: int = 4, site: dict = SITE) -> GenericSpider:
+    """Build a spider over a site map, counting GET requests per path."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return httpx.Response(405)
+        requests[request.url.path] += 1
+        if request.url.path not in site:
+            return httpx.Response(404)
+        content_type, body = site[request.url.path]
+        return httpx.Response(200, headers={"content-type": content_type}, content=body)
+    
+    config = SourceConfig(
+        name="Test",
+        domain_tag="stock_equity",
+        source_org="Test",
+        start_urls=["https://example.com/"],
+        allow_patterns=[r"example\.com/"],
+        deny_patterns=[],
+        max_depth=max_depth,
+        filetypes={"pdf", "html"}
+    )
+    fetcher = AsyncFetcher(str(tmp_path / "cache.db"), transport=httpx.MockTransport(handler))
+    return GenericSpider(config, fetcher, robots_checker or RobotsChecker(fetcher),
+                         concurrency=concurrency)
+
+
+def crawl(spider: GenericSpider, max_pages: int = 10) -> list:
+    """Run a crawl to completion, failing if it doesn't terminate."""
+    async def run():
+        try:
+            return await asyncio.wait_for(spider.crawl(max_pages), timeout=10)
+        finally:
+            await spider.fetcher.aclose()
+    return asyncio.run(run())
+
+
+def test_crawl_dedup_and_depth(tmp_path):
+    """Test that each URL is fetched once and links beyond max_depth are skipped."""
+    requests = Counter()
+    documents = crawl(make_spider(tmp_path, requests))
+    
+    paths = sorted(httpx.URL(doc.record.source_url).path for doc in documents)
+    assert paths == ["/a.pdf", "/b.pdf", "/c.pdf"]
+    assert {doc.content for doc in documents} == {b"%PDF-1.4 a", b"%PDF-1.4 b", b"%PDF-1.4 c"}
+    
+    # Tracking-parameter variants and repeated links are fetched once
+    assert requests["/a.pdf"] == 1
+    assert all(count == 1 for count in requests.values())
+    # /deep.html is at depth 2, so its link to /d.pdf is past max_depth
+    assert requests["/deep.html"] == 1
+    assert requests["/d.pdf"] == 0
+
+
+def test_crawl_max_pages(tmp_path):
+    """Test that the crawl stops collecting documents at max_pages."""
+    documents = crawl(make_spider(tmp_path, Counter()), max_pages=2)
+    
+    assert len(documents) == 2
+
+
+def test_crawl_survives_errors_before_fetch(tmp_path):
+    """Test that an error in the robots check doesn't stop the crawl."""
+    class FlakyRobots:
+        async def is_allowed(self, url: str) -> bool:
+            if url.endswith("/b.pdf"):
+                raise RuntimeError("robots lookup failed")
+            return True
+    
+    spider = make_spider(tmp_path, Counter(), robots_checker=FlakyRobots(), concurrency=1)
+    documents = crawl(spider)
+    
+    paths = sorted(httpx.URL(doc.record.source_url).path for doc in documents)
+    assert paths == ["/a.pdf", "/c.pdf"]
+
+
+def test_crawl_extensionless_urls(tmp_path):
+    """Test that extensionless URLs are classified from the GET's Content-Type."""
+    site = {
+        "/": ("text/html", html_page("/circulars", "/bundle")),
+        "/circulars": ("text/html; charset=utf-8", html_page("/download")),
+        "/download": ("application/pdf", b"%PDF-1.4 download"),
+        "/bundle": ("application/zip", b"PK zip"),
+    }
+    requests = Counter()
+    documents = crawl(make_spider(tmp_path, requests, site=site))
+    
+    assert [httpx.URL(doc.record.source_url).path for doc in documents] == ["/download"]
+    assert documents[0].record.file_type == "pdf"
+    assert requests["/circulars"] == 1
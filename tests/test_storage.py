@@ -0,0 +1,302 @@
+import gc
+import json
+import pytest
+import weakref
+from datetime import date
+from finance_crawler.schema import DocumentRecord, QualityFlags
+from finance_crawler.storage import DocumentStorage
+
+
+def make_record(url: str, source_org: str = "SEBI", published_date: date = date(2024, 1, 15)) -> DocumentRecord:
+    """Create a minimal document record for storage tests."""
+    return DocumentRecord(
+        id=url,
+        title="Test Document",
+        domain="stock_equity",
+        source_org=source_org,
+        source_url=url,
+        file_type="pdf",
+        published_date=published_date,
+        quality_flags=QualityFlags()
+    )
+
+
+def read_catalog(storage: DocumentStorage) -> list:
+    """Read catalog records from all year shards as dicts."""
+    entries = []
+    for path in sorted(storage.catalog_dir.glob("*.jsonl")):
+        with open(path, 'r', encoding='utf-8') as f:
+            entries.extend(json.loads(line) for line in f if line.strip())
+    return entries
+
+
+def test_save_document(tmp_path):
+    """Test that saving writes the file and a catalog entry."""
+    storage = DocumentStorage(str(tmp_path))
+    record = make_record("https://example.com/circular-1.pdf")
+    
+    assert storage.save_document(record, b"%PDF-1.4 content") is True
+    storage.flush()
+    
+    assert record.storage_path == "stock_equity/sebi/2024/pdf__circular-1__2024-01-15.pdf"
+    assert (tmp_path / record.storage_path).read_bytes() == b"%PDF-1.4 content"
+    
+    entries = read_catalog(storage)
+    assert len(entries) == 1
+    assert entries[0]["source_url"] == "https://example.com/circular-1.pdf"
+    assert entries[0]["published_date"] == "2024-01-15"
+    assert entries[0]["quality_flags"]["is_official"] is True
+
+
+def test_save_document_dry_run(tmp_path):
+    """Test that dry runs write nothing."""
+    storage = DocumentStorage(str(tmp_path))
+    record = make_record("https://example.com/circular-1.pdf")
+    
+    assert storage.save_document(record, b"content", dry_run=True) is True
+    assert not storage.catalog_dir.exists()
+
+
+def test_append_catalog_batch(tmp_path):
+    """Test deferred catalog writes."""
+    storage = DocumentStorage(str(tmp_path))
+    records = [make_record(f"https://example.com/doc-{i}.pdf") for i in range(3)]
+    
+    for record in records:
+        storage.save_document(record, b"content", catalog=False)
+    assert not storage.catalog_dir.exists()
+    
+    storage.append_catalog(records)
+    storage.flush()
+    assert [entry["id"] for entry in read_catalog(storage)] == [r.id for r in records]
+
+
+def test_catalog_buffered_until_flush(tmp_path):
+    """Test that catalog lines are buffered and written on close."""
+    with DocumentStorage(str(tmp_path)) as storage:
+        storage.save_document(make_record("https://example.com/a.pdf"), b"a")
+        storage.save_document(make_record("https://example.com/b.pdf"), b"b")
+        assert not storage.catalog_dir.exists()
+    
+    assert len(read_catalog(storage)) == 2
+
+
+def test_catalog_synced_in_groups(tmp_path, monkeypatch):
+    """Test that catalog writes are synced per group and on close."""
+    synced = []
+    monkeypatch.setattr("finance_crawler.storage._fdatasync", synced.append)
+    monkeypatch.setattr("finance_crawler.storage.CATALOG_SYNC_RECORDS", 3)
+    storage = DocumentStorage(str(tmp_path))
+    
+    storage.append_catalog([make_record(f"https://example.com/{i}.pdf") for i in range(2)])
+    storage.flush()
+    assert len(synced) == 0
+    
+    storage.append_catalog([make_record("https://example.com/2.pdf")])
+    storage.flush()
+    assert len(synced) == 1
+    
+    storage.append_catalog([make_record("https://example.com/3.pdf")])
+    storage.close()
+    assert len(synced) == 2
+    assert len(read_catalog(storage)) == 4
+
+
+def test_get_catalog_stats(tmp_path):
+    """Test catalog statistics."""
+    storage = DocumentStorage(str(tmp_path))
+    assert storage.get_catalog_stats() == {"total_documents": 0, "by_source": {}, "by_domain": {}}
+    
+    storage.save_document(make_record("https://example.com/a.pdf", "SEBI"), b"a")
+    storage.save_document(make_record("https://example.com/b.pdf", "SEBI"), b"b")
+    storage.save_document(make_record("https://example.com/c.pdf", "NSE"), b"c")
+    
+    stats = storage.get_catalog_stats()
+    assert stats["total_documents"] == 3
+    assert stats["by_source"] == {"SEBI": 2, "NSE": 1}
+    assert stats["by_domain"] == {"stock_equity": 3}
+
+
+def test_get_catalog_stats_across_batches(tmp_path, monkeypatch):
+    """Test that counts are summed across line batches."""
+    monkeypatch.setattr("finance_crawler.storage.STATS_BATCH_LINES", 3)
+    storage = DocumentStorage(str(tmp_path))
+    
+    for i in range(10):
+        storage.save_document(make_record(f"https://example.com/doc-{i}.pdf", "AMFI"), b"x")
+    
+    stats = storage.get_catalog_stats()
+    assert stats["total_documents"] == 10
+    assert stats["by_source"] == {"AMFI": 10}
+
+
+def test_catalog_sharded_by_year(tmp_path):
+    """Test that records go to per-year shards and stats can select years."""
+    with DocumentStorage(str(tmp_path)) as storage:
+        storage.save_document(make_record("https://example.com/a.pdf", "SEBI", date(2023, 5, 1)), b"a")
+        storage.save_document(make_record("https://example.com/b.pdf", "NSE"), b"b")
+        storage.save_document(make_record("https://example.com/c.pdf", "NSE"), b"c")
+    
+    assert sorted(p.name for p in storage.catalog_dir.iterdir()) == ["2023.jsonl", "2024.jsonl"]
+    assert storage.get_catalog_stats()["by_source"] == {"SEBI": 1, "NSE": 2}
+    assert storage.get_catalog_stats(years=[2023]) == {
+        "total_documents": 1, "by_source": {"SEBI": 1}, "by_domain": {"stock_equity": 1}
+    }
+    assert storage.get_catalog_stats(years=[1999])["total_documents"] == 0
+
+
+def test_save_document_duplicate_content(tmp_path):
+    """Test that identical content from another URL reuses the stored file."""
+    storage = DocumentStorage(str(tmp_path))
+    original = make_record("https://example.com/circular.pdf")
+    mirror = make_record("https://mirror.example.com/copy-of-circular.pdf")
+    
+    assert storage.save_document(original, b"same bytes") is True
+    assert storage.save_document(mirror, b"same bytes") is True
+    
+    assert mirror.storage_path == original.storage_path
+    assert mirror.duplicate_of == original.id
+    assert original.duplicate_of is None
+    assert len(list(tmp_path.rglob("*.pdf"))) == 1
+    
+    storage.flush()
+    entries = read_catalog(storage)
+    assert [entry["duplicate_of"] for entry in entries] == [None, original.id]
+
+
+def test_content_index_persists(tmp_path):
+    """Test that the content index is reloaded by a new storage instance."""
+    with DocumentStorage(str(tmp_path)) as storage:
+        original = make_record("https://example.com/circular.pdf")
+        storage.save_document(original, b"same bytes")
+    
+    mirror = make_record("https://mirror.example.com/copy.pdf")
+    with DocumentStorage(str(tmp_path)) as storage:
+        storage.save_document(mirror, b"same bytes")
+    
+    assert mirror.duplicate_of == original.id
+
+
+def test_same_content_at_path_not_rewritten(tmp_path):
+    """Test that identical bytes for another URL mapping to the same path are kept."""
+    with DocumentStorage(str(tmp_path)) as storage:
+        first = make_record("https://example.com/doc.pdf?v=1")
+        second = make_record("https://example.com/doc.pdf?v=2")
+        storage.save_document(first, b"content")
+        storage.save_document(second, b"content")
+    
+    assert second.storage_path == first.storage_path
+    assert second.duplicate_of is None
+    index = (tmp_path / "content_index.tsv").read_text(encoding="utf-8").splitlines()
+    assert len(index) == 1
+    assert index[0].split("\t")[1] == first.id
+
+
+def test_save_large_document(tmp_path):
+    """Test that documents above the fadvise threshold are written intact."""
+    storage = DocumentStorage(str(tmp_path))
+    record = make_record("https://example.com/large.pdf")
+    content = bytes(range(256)) * 8192  # 2 MB
+    
+    assert storage.save_document(record, content) is True
+    assert (tmp_path / record.storage_path).read_bytes() == content
+
+
+def test_get_catalog_stats_empty_catalog(tmp_path):
+    """Test stats on an existing but empty catalog file."""
+    storage = DocumentStorage(str(tmp_path))
+    storage.catalog_dir.mkdir()
+    (storage.catalog_dir / "2024.jsonl").touch()
+    
+    assert storage.get_catalog_stats()["total_documents"] == 0
+
+
+def test_closed_storage_released(tmp_path):
+    """Test that closing storage drops the exit hook's reference to it."""
+    storage = DocumentStorage(str(tmp_path))
+    storage.save_document(make_record("https://example.com/a.pdf"), b"a")
+    storage.close()
+    
+    ref = weakref.ref(storage)
+    del storage
+    gc.collect()
+    assert ref() is None
+
+
+def test_legacy_catalog_migrated(tmp_path):
+    """Test that a pre-sharding catalog.jsonl is split into year shards."""
+    legacy = [make_record("https://example.com/a.pdf", "SEBI", date(2023, 5, 1)),
+              make_record("https://example.com/b.pdf", "NSE")]
+    (tmp_path / "catalog.jsonl").write_text(
+        "".join(record.model_dump_json() + "\n" for record in legacy), encoding="utf-8"
+    )
+    
+    storage = DocumentStorage(str(tmp_path))
+    
+    assert not (tmp_path / "catalog.jsonl").exists()
+    assert (tmp_path / "catalog.jsonl.migrated").exists()
+    assert sorted(p.name for p in storage.catalog_dir.iterdir()) == ["2023.jsonl", "2024.jsonl"]
+    assert storage.get_catalog_stats()["by_source"] == {"SEBI": 1, "NSE": 1}
+    assert storage.get_catalog_stats(years=[2023])["total_documents"] == 1
+
+
+def test_dry_run_leaves_existing_files(tmp_path):
+    """Test that dry-run storage neither migrates the catalog nor compacts the index."""
+    record = make_record("https://example.com/a.pdf")
+    catalog = record.model_dump_json() + "\n"
+    index = f"{'00' * 16}\t{record.id}\told/path.pdf\n{'00' * 16}\t\t\n"
+    (tmp_path / "catalog.jsonl").write_text(catalog, encoding="utf-8")
+    (tmp_path / "content_index.tsv").write_text(index, encoding="utf-8")
+    
+    with DocumentStorage(str(tmp_path), dry_run=True) as storage:
+        assert storage.save_document(record, b"content", dry_run=True) is True
+    
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["catalog.jsonl", "content_index.tsv"]
+    assert (tmp_path / "catalog.jsonl").read_text(encoding="utf-8") == catalog
+    assert (tmp_path / "content_index.tsv").read_text(encoding="utf-8") == index
+
+
+def test_legacy_catalog_migration_finished_once(tmp_path):
+    """Test that a migration interrupted after the shards were placed isn't redone."""
+    record = make_record("https://example.com/a.pdf")
+    (tmp_path / "catalog.jsonl").write_text(record.model_dump_json() + "\n", encoding="utf-8")
+    (tmp_path / "catalog").mkdir()
+    (tmp_path / "catalog" / "2024.jsonl").write_text(record.model_dump_json() + "\n", encoding="utf-8")
+    
+    storage = DocumentStorage(str(tmp_path))
+    
+    assert not (tmp_path / "catalog.jsonl").exists()
+    assert storage.get_catalog_stats()["total_documents"] == 1
+
+
+def test_revised_document_not_used_for_duplicates(tmp_path):
+    """Test that a path rewritten with revised content drops its old index entry."""
+    with DocumentStorage(str(tmp_path)) as storage:
+        storage.save_document(make_record("https://x.com/circ.pdf"), b"version-1")
+        revised = make_record("https://x.com/circ.pdf")
+        storage.save_document(revised, b"version-2 longer")
+        assert (tmp_path / revised.storage_path).read_bytes() == b"version-2 longer"
+        
+        mirror = make_record("https://mirror.com/circ-copy.pdf")
+        storage.save_document(mirror, b"version-1")
+        assert mirror.duplicate_of is None
+        assert (tmp_path / mirror.storage_path).read_bytes() == b"version-1"
+    
+    # The persisted index agrees after reload and compaction
+    with DocumentStorage(str(tmp_path)) as storage:
+        late_mirror = make_record("https://other.com/copy.pdf")
+        storage.save_document(late_mirror, b"version-2 longer")
+        assert late_mirror.duplicate_of == revised.id
+    
+    lines = (tmp_path / "content_index.tsv").read_text(encoding="utf-8").splitlines()
+    assert all(line.split("\t")[2] for line in lines)
+
+
+def test_revised_document_same_size_rewritten(tmp_path):
+    """Test that revised content of the same size replaces the stored file."""
+    storage = DocumentStorage(str(tmp_path))
+    storage.save_document(make_record("https://x.com/circ.pdf"), b"version-1")
+    revised = make_record("https://x.com/circ.pdf")
+    storage.save_document(revised, b"version-2")
+    
+    assert (tmp_path / revised.storage_path).read_bytes() == b"version-2"
@@ -2,7 +2,8 @@ import pytest
 from finance_crawler.utils import (
     url_filetype, canonical_url, short_title_from_url, 
     generate_document_id, exponential_backoff, is_allowed_filetype,
-    extract_domain_from_url, normalize_url
+    extract_domain_from_url, normalize_url, url_key,
+    content_type_filetype
 )
 
 
@@ -16,6 +17,19 @@ def test_url_filetype():
     assert url_filetype("https://example.com/page.htm") == "html"
     assert url_filetype("https://example.com/noextension") is None
     assert url_filetype("https://example.com/unknown.xyz") is None
+    assert url_filetype("https://example.com/REPORT.PDF") == "pdf"
+    assert url_filetype("https://example.com/doc.pdf?download=1") == "pdf"
+    assert url_filetype("https://example.com/archive.pdf.zip") is None
+
+
+def test_content_type_filetype():
+    """Test file type detection from Content-Type headers."""
+    assert content_type_filetype("application/pdf") == "pdf"
+    assert content_type_filetype("text/html; charset=utf-8") == "html"
+    assert content_type_filetype("Text/CSV") == "csv"
+    assert content_type_filetype("application/vnd.ms-excel") == "xls"
+    assert content_type_filetype("application/zip") is None
+    assert content_type_filetype("") is None
 
 
 def test_canonical_url():
@@ -77,6 +91,10 @@ def test_exponential_backoff():
     # Test max delay
     large_attempt = exponential_backoff(10)
     assert large_attempt <= 60.0  # max_delay
+    
+    # Huge attempt counts are capped without building huge ints
+    assert exponential_backoff(10_000_000) == 60.0
+    assert exponential_backoff(3, base_delay=0.5, max_delay=100.0) == 4.0
 
 
 def test_is_allowed_filetype():
@@ -107,3 +125,20 @@ def test_normalize_url():
     normalized = normalize_url(url_with_query)
     assert "param=value" in normalized
     assert "#" not in normalized
+
+
+def test_url_key():
+    """Test canonical URL keys used for deduplication."""
+    base = url_key("https://www.sebi.gov.in/legal/circulars")
+    
+    assert url_key("HTTPS://WWW.SEBI.GOV.IN/legal/circulars") == base
+    assert url_key("https://www.sebi.gov.in/legal/circulars/") == base
+    assert url_key("https://www.sebi.gov.in/legal/circulars#top") == base
+    assert url_key("https://www.sebi.gov.in/legal/circulars?utm_source=x") == base
+    
+    # Query order doesn't matter, but values do
+    assert url_key("https://example.com/view?b=2&a=1") == url_key("https://example.com/view?a=1&b=2")
+    assert url_key("https://example.com/view?id=1") != url_key("https://example.com/view?id=2")
+    
+    # Path case is significant
+    assert url_key("https://example.com/Doc.pdf") != url_key("https://example.com/doc.pdf")